@@ -8,7 +8,9 @@ from typing import TYPE_CHECKING
 
 from .helper import (
     get_bigquery_client,
+    get_bigquery_table,
     truncate_bigquery_table,
+    upload_records_to_bigquery,
     upload_to_bigquery,
 )
 
@@ -30,28 +32,61 @@ class BigQueryHandler:
         """Initializes the BigQueryHandler object."""
         self.config = config
         self._client: bigquery.Client | None = None
+        self._tables: dict[str, bigquery.Table] = {}
 
     def connect(self) -> None:
         """Connects to the cloud storage location."""
         self._client = get_bigquery_client(self.config.google_credentials)
 
     def disconnect(self) -> None:
-        """Disconnects from the cloud storage location."""
-        self._client.close()
+        """Disconnects from the cloud storage location.
+
+        The client itself is left open since it is shared between handlers.
+        """
         self._client = None
+        self._tables.clear()
 
     def upload(
         self,
         which: BigQueryItem,
         df: pd.DataFrame,
-    ) -> Sequence[Sequence[dict]]:
-        """Uploads the data to the desired table."""
-        return upload_to_bigquery(self._client, which.table(self.config), df)
+        replace: bool = False,
+    ) -> list[dict]:
+        """Uploads the data to the desired table.
+
+        If replace is True, the existing rows of the table are replaced.
+        """
+        table = self._get_table(which.table(self.config))
+        return upload_to_bigquery(self._client, table, df, replace=replace)
+
+    def upload_records(
+        self,
+        which: BigQueryItem,
+        records: Sequence[dict],
+        replace: bool = False,
+    ) -> list[dict]:
+        """Uploads records (as dictionaries) to the desired table.
+
+        If replace is True, the existing rows of the table are replaced.
+        """
+        table = self._get_table(which.table(self.config))
+        return upload_records_to_bigquery(
+            self._client,
+            table,
+            records,
+            replace=replace,
+        )
 
     def truncate(self, which: BigQueryItem) -> bigquery.QueryJob:
         """Truncates the data from the desired storage location."""
         return truncate_bigquery_table(self._client, which.table(self.config))
 
+    def _get_table(self, table_id: str) -> bigquery.Table:
+        """Gets the requested table, reusing it if it was already fetched."""
+        if table_id not in self._tables:
+            self._tables[table_id] = get_bigquery_table(self._client, table_id)
+        return self._tables[table_id]
+
     def __enter__(self) -> Self:
         """Enters the context manager."""
         self.connect()
@@ -2,16 +2,21 @@
 Handles interactions with Google BigQuery.
 """
 
+from functools import lru_cache
 from typing import Sequence
 
 import pandas as pd
+from google.api_core.exceptions import GoogleAPICallError
 from google.cloud import bigquery
 
 
+@lru_cache(maxsize=None)
 def get_bigquery_client(credentials: str) -> bigquery.Client:
     """Gets an instance of the BigQuery client.
 
     The only parameter is the path to the credentials JSON file as a string.
+    Clients are cached per credentials file, so the same client (and its
+    connections) is shared for the lifetime of the process.
     """
     return bigquery.Client.from_service_account_json(credentials)
 
@@ -24,14 +29,73 @@ def get_bigquery_table(
     return client.get_table(table_id)
 
 
+def get_load_job_config(
+    schema: list[bigquery.SchemaField],
+    replace: bool = False,
+) -> bigquery.LoadJobConfig:
+    """Gets the configuration for a load job with an explicit schema.
+
+    The data is appended by default; if replace is True, the existing rows are
+    atomically replaced by the same job.
+    """
+    return bigquery.LoadJobConfig(
+        schema=schema,
+        write_disposition=(
+            bigquery.WriteDisposition.WRITE_TRUNCATE
+            if replace
+            else bigquery.WriteDisposition.WRITE_APPEND
+        ),
+    )
+
+
+def get_load_job_errors(job: bigquery.LoadJob) -> list[dict]:
+    """Waits for a load job to finish and returns any errors.
+
+    Only errors reported by the job itself are returned; any other failure
+    (e.g. while polling the job) is raised so that it is never mistaken for a
+    successful upload.
+    """
+    try:
+        job.result()
+    except GoogleAPICallError:
+        if not job.errors:
+            raise
+    return job.errors or []
+
+
 def upload_to_bigquery(
     client: bigquery.Client,
-    table_id: str,
+    table: bigquery.Table,
     df: pd.DataFrame,
-) -> Sequence[Sequence[dict]]:
-    """Uploads data to a BigQuery table and returns any errors."""
-    table = get_bigquery_table(client, table_id=table_id)
-    return client.insert_rows_from_dataframe(table, dataframe=df)
+    replace: bool = False,
+) -> list[dict]:
+    """Uploads data to a BigQuery table and returns any errors.
+
+    The data is uploaded using a single load job, which sends the dataframe
+    as a columnar payload rather than streaming it row by row. The schema is
+    taken from the provided table so that the client does not look it up.
+    """
+    schema = [field for field in table.schema if field.name in df.columns]
+    job_config = get_load_job_config(schema, replace=replace)
+    job = client.load_table_from_dataframe(df, table, job_config=job_config)
+    return get_load_job_errors(job)
+
+
+def upload_records_to_bigquery(
+    client: bigquery.Client,
+    table: bigquery.Table,
+    records: Sequence[dict],
+    replace: bool = False,
+) -> list[dict]:
+    """Uploads records (as dictionaries) to a BigQuery table.
+
+    The records are sent as newline-delimited JSON using a single load job
+    with the schema of the provided table, so values such as ISO timestamps
+    are converted by BigQuery rather than beforehand. Returns any errors.
+    """
+    job_config = get_load_job_config(table.schema, replace=replace)
+    job = client.load_table_from_json(records, table, job_config=job_config)
+    return get_load_job_errors(job)
 
 
 def truncate_bigquery_table(
@@ -14,13 +14,14 @@ from .helper import (
     download_json_from_storage,
     get_storage_bucket,
     get_storage_client,
+    open_blob_from_storage,
     upload_image_to_storage,
     upload_json_to_storage,
 )
 
 if TYPE_CHECKING:
     from types import TracebackType
-    from typing import Any, Self
+    from typing import Any, BinaryIO, Self
 
     from google.cloud.storage import Client
 
@@ -40,6 +41,11 @@ class StorageHandler(ABC):
         """Loads the data from the desired storage location."""
         ...
 
+    @abstractmethod
+    def open(self, which: StorageItem) -> BinaryIO:
+        """Opens the data from the desired storage location as a stream."""
+        ...
+
     @abstractmethod
     def save_image(
         self,
@@ -83,15 +89,23 @@ class LocalStorageHandler(StorageHandler):
         self.config = config
 
     def save(self, which: StorageItem, data: Any) -> None:
-        """Saves the data to the local storage location."""
+        """Saves the data to the local storage location.
+
+        The data is written without indentation to keep the files small.
+        """
         destination = self.config.get_data_path(which.filename(self.config))
-        write_json(destination, data)
+        write_json(destination, data, indent=False)
 
     def load(self, which: StorageItem) -> Any:
         """Loads the data from the local storage location."""
         destination = self.config.get_data_path(which.filename(self.config))
         return read_json(destination)
 
+    def open(self, which: StorageItem) -> BinaryIO:
+        """Opens the data from the local storage location as a stream."""
+        destination = self.config.get_data_path(which.filename(self.config))
+        return open(destination, "rb")
+
     def save_image(
         self,
         which: StorageItem,
@@ -123,14 +137,22 @@ class CloudStorageHandler(StorageHandler):
         """Initializes the CloudStorageHandler object."""
         self.config = config
         self._client: Client | None = None
+        self._depth = 0
 
     def connect(self) -> None:
-        """Connects to the cloud storage location."""
+        """Connects to the cloud storage location.
+
+        Does nothing if the handler is already connected.
+        """
+        if self._client is not None:
+            return
         self._client = get_storage_client(self.config.google_credentials)
 
     def disconnect(self) -> None:
-        """Disconnects from the cloud storage location."""
-        self._client.close()
+        """Disconnects from the cloud storage location.
+
+        The client itself is left open since it is shared between handlers.
+        """
         self._client = None
 
     def save(self, which: StorageItem, data: Any) -> None:
@@ -143,6 +165,11 @@ class CloudStorageHandler(StorageHandler):
         bucket = get_storage_bucket(self._client, which.bucket(self.config))
         return download_json_from_storage(bucket, which.filename(self.config))
 
+    def open(self, which: StorageItem) -> BinaryIO:
+        """Opens the data from the cloud storage location as a stream."""
+        bucket = get_storage_bucket(self._client, which.bucket(self.config))
+        return open_blob_from_storage(bucket, which.filename(self.config))
+
     def save_image(
         self,
         which: StorageItem,
@@ -156,7 +183,12 @@ class CloudStorageHandler(StorageHandler):
         upload_image_to_storage(bucket, data, filename, content_type)
 
     def __enter__(self) -> Self:
-        """Enters the context manager."""
+        """Enters the context manager.
+
+        The handler can be entered more than once (it is shared through the
+        config), and stays connected until the outermost context exits.
+        """
+        self._depth += 1
         self.connect()
         return self
 
@@ -167,4 +199,6 @@ class CloudStorageHandler(StorageHandler):
         traceback: TracebackType | None,
     ) -> None:
         """Exits the context manager."""
-        self.disconnect()
+        self._depth -= 1
+        if self._depth == 0:
+            self.disconnect()
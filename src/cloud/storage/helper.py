@@ -3,16 +3,23 @@ Handles interactions with Google Storage.
 """
 
 import datetime as dt
-import json
+import gzip
+import io
+from functools import lru_cache
 from typing import Any
 
 from google.cloud import storage
 
+from ...utilities import dumps_json, loads_json
 
+
+@lru_cache(maxsize=None)
 def get_storage_client(credentials: str) -> storage.Client:
     """Gets an instance of the storage client.
 
     The only parameter is the path to the credentials JSON file as a string.
+    Clients are cached per credentials file, so the same client (and its
+    connections) is shared for the lifetime of the process.
     """
     return storage.Client.from_service_account_json(credentials)
 
@@ -70,12 +77,22 @@ def upload_json_to_storage(
     """Uploads a JSON string to the provided storage bucket.
 
     Requires the bucket object to be uploaded to, the source string, and
-    the destination file path.
+    the destination file path. Non-string data is serialized straight to
+    bytes so that no intermediate string is created.
+
+    The data is stored gzip-compressed with a matching content encoding, so
+    it is transparently decompressed when downloaded.
     """
-    if not isinstance(data, str):
-        data = json.dumps(data)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    else:
+        data = dumps_json(data)
     blob = get_storage_blob(bucket, destination)
-    blob.upload_from_string(data, content_type="application/json")
+    blob.content_encoding = "gzip"
+    blob.upload_from_string(
+        gzip.compress(data, compresslevel=6),
+        content_type="application/json",
+    )
 
 
 def download_file_from_storage(
@@ -102,8 +119,21 @@ def download_json_from_storage(
     and the destination file path.
     """
     blob = get_storage_blob(bucket, source)
-    data = blob.download_as_string()
-    return json.loads(data)
+    return loads_json(blob.download_as_bytes())
+
+
+def open_blob_from_storage(
+    bucket: storage.Bucket,
+    source: str,
+) -> io.BytesIO:
+    """Opens a blob from the provided storage bucket for reading as bytes.
+
+    Requires the bucket object to be read from and the source file path. The
+    blob is downloaded in a single request rather than in ranges, since range
+    requests cannot be combined with decompressing gzip-encoded blobs.
+    """
+    blob = get_storage_blob(bucket, source)
+    return io.BytesIO(blob.download_as_bytes())
 
 
 def get_last_updated_time(
@@ -5,6 +5,8 @@ Handles the project configuration, including reading the relevant files.
 from __future__ import annotations
 
 import datetime as dt
+import os
+from functools import cached_property, lru_cache
 from typing import TYPE_CHECKING
 
 from .structures.enums import StorageMode
@@ -14,6 +16,11 @@ if TYPE_CHECKING:
     from pathlib import Path
     from typing import Any
 
+    from .cloud.storage.handler import StorageHandler
+
+
+_MISSING = object()
+
 
 class Config:
     """Handles the project configuration."""
@@ -21,6 +28,7 @@ class Config:
     CONFIG_FILENAME: str = "config.json"
     SECRETS_FILENAME: str = "secrets.json"
     GOOGLE_CREDENTIALS_FILENAME: str = "gcp-credentials.json"
+    DEFAULT_REQUESTS_PER_SECOND: float = 0.2
 
     CREATED = dt.datetime.now(dt.timezone.utc)
 
@@ -51,35 +59,67 @@ class Config:
         self.config_directory: Path = to_path(config_directory, "./cfg/")
         self.data_directory: Path = to_path(data_directory, "./data/")
         self.storage_mode: StorageMode = storage_mode
+        self._listings: dict[Path, frozenset[str]] = {}
+        self._values: dict[tuple[str, ...], Any] = {}
 
         # Load the config and secrets files
         self.refresh()
 
     def refresh(self) -> None:
-        """Refreshes the configuration object."""
+        """Refreshes the configuration object.
+
+        Values that are read for every request are also resolved once here
+        and stored as attributes.
+        """
+        self.invalidate_listing()
+        self._values.clear()
         config = read_json(self.get_config_path())
         secrets = read_json(self.get_config_path(self.SECRETS_FILENAME))
         self.config = config | secrets
+        self.endpoints: dict[str, str] = self.config["endpoints"]
+        self.user_agent: str = self.config["user_agent"]
+        self.timeout: float = self.config["timeout"]
+        self.save_icons: bool = self.config["save_icons"]
+        self.requests_per_second: float = self.config.get(
+            "requests_per_second",
+            self.DEFAULT_REQUESTS_PER_SECOND,
+        )
+        if self.requests_per_second <= 0:
+            raise ValueError(
+                "Config value 'requests_per_second' must be greater than 0, "
+                f"not {self.requests_per_second}."
+            )
 
     def get(self, *keys: list[str]) -> Any:
         """Gets a value from the configuration dictionary.
 
-        Multiple keys can be provided to access nested values.
+        Multiple keys can be provided to access nested values. Values are
+        cached by their keys until the configuration is refreshed.
         """
 
+        # Return the cached value if the keys have been seen before
+        value = self._values.get(keys, _MISSING)
+        if value is not _MISSING:
+            return value
+
         # Iterate through the keys and get the value
         value = self.config
         for key in keys:
             value = value[key]
+        self._values[keys] = value
         return value
 
     def get_config_path(
         self,
         filename: str | None = None,
         as_string: bool = False,
-        check_exists: bool = True,
+        check_exists: bool = False,
     ) -> Path | str:
-        """Gets the path to the config file."""
+        """Gets the path to the config file.
+
+        Existence is not checked by default, since reading a missing file
+        raises FileNotFoundError anyway.
+        """
         return self._get_path_with_base(
             self.config_directory,
             filename if filename is not None else self.CONFIG_FILENAME,
@@ -103,10 +143,32 @@ class Config:
             check_exists,
         )
 
+    @cached_property
+    def storage_handler(self) -> StorageHandler:
+        """Gets the storage handler for the configured storage mode.
+
+        The handler is created once and reused, so it can be entered as a
+        context manager any number of times.
+        """
+        from .cloud.storage.handler import StorageHandler
+
+        return StorageHandler.from_config(self)
+
     @property
     def google_credentials(self) -> str:
         """Gets the path to the Google credentials file."""
-        return self.get_config_path(self.GOOGLE_CREDENTIALS_FILENAME)
+        return self.get_config_path(
+            self.GOOGLE_CREDENTIALS_FILENAME,
+            check_exists=True,
+        )
+
+    def invalidate_listing(self) -> None:
+        """Clears the cached directory listings.
+
+        Should be called if files are added to or removed from the config or
+        data directories after their existence has been checked.
+        """
+        self._listings.clear()
 
     def __getitem__(self, key: str) -> str:
         """Gets a value from the configuration dictionary."""
@@ -121,7 +183,34 @@ class Config:
         check_exists: bool = True,
     ) -> Path | str:
         """Gets the path to the config file."""
-        path = base_path / filename
-        if check_exists and not path.exists():
+        path = _join_path(base_path, filename, resolve=as_string)
+        if check_exists and not self._exists(base_path, filename):
             raise FileNotFoundError(error_message)
-        return path.resolve() if as_string else path
+        return str(path) if as_string else path
+
+    def _exists(self, base_path: Path, filename: str) -> bool:
+        """Checks whether a file exists using a cached directory listing.
+
+        Files in subdirectories are checked directly instead.
+        """
+        if os.path.dirname(filename):
+            return (base_path / filename).exists()
+        listing = self._listings.get(base_path)
+        if listing is None:
+            try:
+                with os.scandir(base_path) as entries:
+                    listing = frozenset(entry.name for entry in entries)
+            except FileNotFoundError:
+                listing = frozenset()
+            self._listings[base_path] = listing
+        return filename in listing
+
+
+@lru_cache(maxsize=32)
+def _join_path(base_path: Path, filename: str, resolve: bool) -> Path:
+    """Joins a filename onto a base path, resolving it if requested.
+
+    Results are cached since the same few paths are requested repeatedly.
+    """
+    path = base_path / filename
+    return path.resolve() if resolve else path
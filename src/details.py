@@ -4,18 +4,35 @@ Generates a JSON file with all tradeable items in the game.
 
 import datetime as dt
 import json
+import os
 import random
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 
+import ijson
 import pandas as pd
-import pytz
 import requests
+import urllib3
 from tqdm import tqdm
 
 from .cloud.bigquery.handler import BigQueryHandler
 from .cloud.storage.handler import StorageHandler
 from .config import Config
 from .structures.enums import BigQueryItem, StorageItem, StorageMode
-from .utilities import get_iso_datetime, wait_for_okay
+from .utilities import (
+    as_completed_paced,
+    create_session,
+    dumps_json,
+    get_iso_datetime,
+    iter_json_keys,
+    loads_json,
+    read_jsonl,
+)
+
+JOURNAL_FILENAME = "details.jsonl"
+BOOLEAN_VALUES = {"true": True, "false": False}
+
+_SESSION = create_session()
 
 
 def get_item_details(config: Config) -> dict:
@@ -23,7 +40,7 @@ def get_item_details(config: Config) -> dict:
     result_type = StorageItem.DETAILS
     filename = result_type.filename
     try:
-        with StorageHandler.from_config(config) as handler:
+        with config.storage_handler as handler:
             return handler.load(result_type)
     except FileNotFoundError:
         tqdm.write(f"Error occurred while opening JSON file '{filename}'.")
@@ -32,23 +49,55 @@ def get_item_details(config: Config) -> dict:
     return {}
 
 
-def get_item_ids(config: Config) -> list[int]:
-    """Gets a list of IDs for all tradeable items in the game."""
+def get_existing_item_ids(config: Config) -> list[str]:
+    """Gets the IDs of all items in the item details JSON file.
+
+    The file is streamed so that the item details themselves are never loaded.
+    """
+    result_type = StorageItem.DETAILS
+    filename = result_type.filename(config)
     try:
-        response = requests.get(
-            url=config.get("endpoints", "wiki"),
-            headers={"User-Agent": config.get("user_agent")},
-            timeout=config.get("timeout"),
-        )
-    except requests.exceptions.RequestException:
+        with (
+            config.storage_handler as handler,
+            handler.open(result_type) as f,
+        ):
+            return list(iter_json_keys(f, "items"))
+    except FileNotFoundError:
+        tqdm.write(f"Error occurred while opening JSON file '{filename}'.")
+    except ijson.JSONError:
+        tqdm.write(f"Error occurred while decoding JSON file '{filename}'.")
+    return []
+
+
+def get_item_ids(config: Config) -> list[str]:
+    """Gets a list of IDs for all tradeable items in the game.
+
+    IDs are kept as strings to match the keys of the item details dictionary.
+    The response is streamed so that only the keys are ever materialized.
+    """
+    try:
+        with _SESSION.get(
+            url=config.endpoints["wiki"],
+            headers={"User-Agent": config.user_agent},
+            timeout=config.timeout,
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            return list(iter_json_keys(response.raw, "data"))
+    except (
+        requests.exceptions.RequestException,
+        urllib3.exceptions.HTTPError,
+    ):
         tqdm.write("Error occurred while fetching item IDs.")
         return []
-    return list(int(item_id) for item_id in response.json()["data"].keys())
 
 
 def get_item_details_from_id(
-    item_id: int,
+    item_id: int | str,
     config: Config,
+    session: requests.Session = _SESSION,
+    raw: bool = False,
 ) -> dict:
     """Gets the details for a specific item ID.
 
@@ -56,28 +105,38 @@ def get_item_details_from_id(
     When the dictionary is cleaned, trade information is removed. To disable
     cleaning, set the `raw` parameter to `True`.
 
+    The request is made with the shared session unless another is provided;
+    sessions are safe to share between the worker threads fetching details.
+
     Will throw an exception if the request fails.
     """
-    response = requests.get(
-        url=config.get("endpoints", "details"),
+    response = session.get(
+        url=config.endpoints["details"],
         params={"item": item_id},
-        headers={"User-Agent": config.get("user_agent")},
-        timeout=config.get("timeout"),
+        headers={"User-Agent": config.user_agent},
+        timeout=config.timeout,
     )
     response.raise_for_status()
-    return response.json()["item"]
+    item_details = loads_json(response.content)["item"]
+    return item_details if raw else clean_item_details(item_details)
 
 
-def randomly_select_ids(items: dict, config: Config) -> list[int]:
+def randomly_select_ids(items: dict, config: Config) -> list[str]:
     """Randomly selects outdated items from the provided dictionary."""
     threshold_days = config.get("minimum_days_before_update")
     chunk_size = config.get("update_chunk_size")
-    outdated_items = []
-    for item_id, details in items.items():
-        last_updated = dt.datetime.fromisoformat(details["updated_at"])
-        cutoff = dt.datetime.now(pytz.utc) - dt.timedelta(days=threshold_days)
-        if last_updated < cutoff:
-            outdated_items.append(int(item_id))
+    now = dt.datetime.now(dt.timezone.utc)
+    cutoff = now - dt.timedelta(days=threshold_days)
+    last_updated = pd.to_datetime(
+        pd.Series(
+            [details["updated_at"] for details in items.values()],
+            index=list(items.keys()),
+            dtype=object,
+        ),
+        format="ISO8601",
+        utc=True,
+    )
+    outdated_items = last_updated.index[last_updated < cutoff].tolist()
     population_size = len(outdated_items)
     tqdm.write(f"Found {population_size} outdated items.")
     return random.sample(outdated_items, k=min(chunk_size, population_size))
@@ -86,14 +145,27 @@ def randomly_select_ids(items: dict, config: Config) -> list[int]:
 def fetch_item_details(
     data: dict,
     config: Config,
+    handler: StorageHandler,
     wait: float = 5.0,
     chunk_size: int = 20,
+    workers: int = 4,
+    icon_workers: int = 8,
 ) -> dict:
     """Gets details for all tradeable items as well as a list of invalid IDs.
 
+    The provided storage handler must already be connected; it is used for
+    every save and icon upload made during the fetch.
     Wait is the amount of time to wait between requests (defaults to 5 seconds,
     which will avoid rate limiting).
-    Chunk size is the number of items to fetch before saving intermittently.
+    Chunk size is the number of items to fetch before flushing the journal.
+    Workers is the maximum number of requests that can be in flight at once,
+    which keeps slow responses from delaying the next request.
+    Icon workers is the number of threads that save item icons in the
+    background, so that icons never hold up fetching the details.
+
+    Fetched items are appended to a journal file as they arrive rather than
+    rewriting the entire details file; the journal is consolidated into the
+    details file once the fetch completes, or on the next run if interrupted.
     """
 
     # Verify that the data has the necessary format
@@ -102,13 +174,23 @@ def fetch_item_details(
     if "invalid" not in data:
         data["invalid"] = []
 
-    # Determine which items are missing
+    # Recover any items journaled by a previous unfinished run
+    journal_path = config.get_data_path(JOURNAL_FILENAME)
+    if journal_path.exists():
+        tqdm.write("Recovering unsaved details from journal...")
+        replay_item_details_journal(data, journal_path)
+        save_item_details(data, handler=handler)
+        os.remove(journal_path)
+
+    # Determine which items are missing (IDs are compared as strings)
     all_ids = get_item_ids(config=config)
     details = data["items"]
-    invalid_ids = data["invalid"]
-    existing_ids = [int(item_id) for item_id in details]
+    invalid_ids = {str(item_id) for item_id in data["invalid"]}
     outdated_ids = randomly_select_ids(details, config=config)
-    missing_ids = list(set(all_ids) - set(existing_ids) - set(invalid_ids))
+    missing_ids = sorted(
+        set(all_ids).difference(details, invalid_ids),
+        key=int,
+    )
     ids_to_fetch = missing_ids + outdated_ids
 
     # Return if there are no missing items
@@ -128,132 +210,181 @@ def fetch_item_details(
     )
 
     # Continuously fetch missing item details until all items are fetched
-    interrupted = False
-    unsaved_count = 0
-    max_length = len(str(max(ids_to_fetch)))
-    for item_id in ids_to_fetch:
+    finished = False
+    unflushed_count = 0
+    max_length = max((len(item_id) for item_id in ids_to_fetch), default=0)
+    error_message = f"✖️ {{:>{max_length}}}: Error"
+    fetch = partial(get_item_details_from_id, config=config, raw=True)
+    icon_uploads: list[tuple[str, Future]] = []
+    with (
+        open(journal_path, "ab") as journal,
+        ThreadPoolExecutor(max_workers=icon_workers) as icon_pool,
+    ):
         try:
-            item_details = get_item_details_from_id(item_id, config=config)
-            icon_url = item_details.get("icon", None)
-            item_details = clean_item_details(item_details)
+            for item_id, future in as_completed_paced(
+                fetch,
+                ids_to_fetch,
+                wait=wait,
+                workers=workers,
+            ):
+                icon_url = None
+                try:
+                    item_details = future.result()
+                    icon_url = item_details.get("icon", None)
+                    item_details = clean_item_details(item_details)
+                except (
+                    requests.exceptions.RequestException,
+                    json.JSONDecodeError,
+                ):
+                    tqdm_bar.set_description("Skipping")
+                    tqdm.write(error_message.format(item_id))
+                    data["invalid"].append(int(item_id))
+                    record = {"id": item_id, "details": None}
+                else:
+                    data["items"][item_id] = item_details
+                    tqdm_bar.set_description("Fetching")
+                    tqdm_bar.set_postfix_str(
+                        f"{item_id}: {item_details['name']}",
+                        refresh=False,
+                    )
+                    record = {"id": item_id, "details": item_details}
+                tqdm_bar.update(1)
+                journal.write(dumps_json(record) + b"\n")
+                unflushed_count += 1
+                # Save each image to Cloud Storage in the background
+                if config.save_icons and (icon_url is not None):
+                    icon_upload = icon_pool.submit(
+                        upload_item_icon,
+                        icon_url,
+                        item_id,
+                        handler=handler,
+                    )
+                    icon_uploads.append((item_id, icon_upload))
+                # Flush the journal to disk if the chunk size is reached
+                if unflushed_count >= chunk_size:
+                    unflushed_count = 0
+                    journal.flush()
         except KeyboardInterrupt:
-            interrupted = True
-        except (requests.exceptions.RequestException, json.JSONDecodeError):
-            tqdm_bar.set_description("Skipping")
-            tqdm.write(f"✖️ {item_id:>{max_length}}: Error")
-            tqdm_bar.update(1)
-            unsaved_count += 1
-            data["invalid"].append(item_id)
-        else:
-            data["items"][str(item_id)] = item_details
-            tqdm_bar.set_description("Fetching")
-            tqdm.write(f"✔️ {item_id:>{max_length}}: {item_details['name']}")
-            tqdm_bar.update(1)
-            unsaved_count += 1
-        # Save each image to Cloud Storage
-        if config["save_icons"] and (icon_url is not None):
-            tqdm.write("Saving item icon...")
-            upload_item_icon(icon_url, item_id, config=config)
-        # Save the unsaved details if the chunk size is reached
-        if unsaved_count >= chunk_size:
-            unsaved_count = 0
-            tqdm.write("Writing unsaved details to JSON file...")
-            save_item_details(data, config=config)
-        # Wait to avoid rate limiting while monitoring for interrupts
-        if not interrupted and not wait_for_okay(wait):
             tqdm_bar.set_description("Stopping")
             tqdm_bar.close()
             tqdm.write("Stopping fetch due to user interrupt.")
-            break
-    else:
-        tqdm_bar.close()
-        save_item_details(data, config=config)
+        else:
+            tqdm_bar.close()
+            finished = True
+        if icon_uploads:
+            tqdm.write("Waiting for item icons to finish saving...")
+
+    # Report any icons that could not be saved
+    failed_icons = ", ".join(
+        item_id
+        for item_id, icon_upload in icon_uploads
+        if icon_upload.exception() is not None
+    )
+    if failed_icons:
+        tqdm.write(f"Failed to save icons for items: {failed_icons}")
+
+    # Consolidate the journal into the details file once everything is fetched
+    if finished:
+        save_item_details(data, handler=handler)
+        os.remove(journal_path)
     tqdm.write("Finished fetching items.")
     return data
 
 
-def clean_item_details(item_details: dict) -> dict:
-    """Cleans the item details dictionary.
+def replay_item_details_journal(data: dict, filename: str) -> dict:
+    """Merges the records from an item details journal into the data.
 
-    Removes unnecessary fields and adds the time that the item was updated.
+    Each record holds an item ID and its details, or None if the ID is invalid.
     """
+    invalid_ids = set(data["invalid"])
+    for record in read_jsonl(filename):
+        item_id, item_details = int(record["id"]), record["details"]
+        if item_details is not None:
+            data["items"][str(item_id)] = item_details
+        elif item_id not in invalid_ids:
+            invalid_ids.add(item_id)
+            data["invalid"].append(item_id)
+    return data
 
-    # Define a list of desired keys
-    desired_keys = [
-        "id",
-        "name",
-        "description",
-        "members",
-    ]
-    # Remove any undesired keys and return
-    item_details = {
-        key: value
-        for key, value in item_details.items()
-        if key in desired_keys
-    }
-
-    # Convert boolean values
-    item_details["members"] = {
-        "true": True,
-        "false": False,
-    }.get(item_details["members"], None)
 
-    # Add the time that the item was updated
-    item_details["updated_at"] = get_iso_datetime()
+def clean_item_details(item_details: dict) -> dict:
+    """Cleans the item details dictionary.
 
-    # Return the cleaned item details
-    return item_details
+    Only the desired fields are copied, with the members flag converted to a
+    boolean, and the time that the item was updated is added.
+    """
+    return {
+        "id": item_details["id"],
+        "name": item_details["name"],
+        "description": item_details["description"],
+        "members": BOOLEAN_VALUES.get(item_details["members"]),
+        "updated_at": get_iso_datetime(),
+    }
 
 
-def save_item_details(data: dict, config: Config) -> dict:
+def save_item_details(data: dict, handler: StorageHandler) -> dict:
     """Saves the item details to a JSON file and returns the dictionary."""
 
     # Add the time that the data was updated
     data["updated_at"] = get_iso_datetime()
 
-    # Sort the appropriate structures by ID
+    # Sort the appropriate structures by ID (item keys are the IDs)
     data["invalid"] = sorted(data["invalid"])
-    data["items"] = dict(
-        sorted(data["items"].items(), key=lambda i: i[1]["id"])
-    )
+    items = data["items"]
+    data["items"] = {
+        item_id: items[item_id] for item_id in sorted(items, key=int)
+    }
 
     # Save the data to a JSON file and return
-    with StorageHandler.from_config(config) as handler:
-        handler.save(StorageItem.DETAILS, data)
+    handler.save(StorageItem.DETAILS, data)
     return data
 
 
-def upload_item_icon(url: str, item_id: int, config: Config) -> None:
+def upload_item_icon(
+    url: str,
+    item_id: int | str,
+    handler: StorageHandler,
+) -> None:
     """Uploads the item icons to Cloud Storage."""
-    response = requests.get(url)
+    response = _SESSION.get(url)
     response.raise_for_status()
     filename = f"images/{item_id}.gif"
-    with StorageHandler.from_config(config) as handler:
-        handler.save_image(StorageItem.DETAILS, response.content, filename)
+    handler.save_image(StorageItem.DETAILS, response.content, filename)
 
 
 def upload_item_details(data: dict, config: Config) -> None:
-    """Uploads the item prices to BigQuery."""
-    records = list(data["items"].values())
-    df = pd.DataFrame.from_records(records)
-    df.columns = ["id", "name", "description", "is_members", "updated_at"]
-    df["updated_at"] = pd.to_datetime(
-        df["updated_at"],
-        format="ISO8601",
-        utc=True,
-    )
+    """Uploads the item details to BigQuery."""
+    records = [
+        {
+            "id": details["id"],
+            "name": details["name"],
+            "description": details["description"],
+            "is_members": details["members"],
+            "updated_at": details["updated_at"],
+        }
+        for details in data["items"].values()
+    ]
     with BigQueryHandler(config) as handler:
-        handler.truncate(BigQueryItem.ITEMS)
-        errors = handler.upload(BigQueryItem.ITEMS, df)
+        errors = handler.upload_records(
+            BigQueryItem.ITEMS,
+            records,
+            replace=True,
+        )
         if any(item for item in errors):
             tqdm.write("Errors occurred while handling details.")
-            tqdm.write(errors)
+            tqdm.write(str(errors))
 
 
 def generate_item_details(config: Config) -> dict:
     """Generates the item details file from start to finish."""
     details_data = get_item_details(config=config)
-    result = fetch_item_details(details_data, config=config)
+    with config.storage_handler as handler:
+        result = fetch_item_details(
+            details_data,
+            config=config,
+            handler=handler,
+            wait=1 / config.requests_per_second,
+        )
     if config.storage_mode == StorageMode.CLOUD:
         upload_item_details(result, config=config)
     return result
@@ -2,19 +2,25 @@
 Generates a JSON file with curent prices for all tradeable items in the game.
 """
 
-import time
 import uuid
+from functools import partial
 
 import pandas as pd
 import requests
 from tqdm import tqdm
 
 from .cloud.bigquery.handler import BigQueryHandler
-from .cloud.storage.handler import StorageHandler
 from .config import Config
-from .details import get_item_details
+from .details import get_existing_item_ids
 from .structures.enums import BigQueryItem, StorageItem, StorageMode
-from .utilities import as_chunks
+from .utilities import (
+    as_chunks,
+    as_completed_paced,
+    create_session,
+    loads_json,
+)
+
+_SESSION = create_session()
 
 
 def get_current_prices_for_ids(
@@ -28,16 +34,16 @@ def get_current_prices_for_ids(
     """
 
     try:
-        response = requests.get(
-            url=config.get("endpoints", "weirdgloop"),
+        response = _SESSION.get(
+            url=config.endpoints["weirdgloop"],
             params={"id": "|".join(str(item_id) for item_id in item_ids)},
-            headers={"User-Agent": config.get("user_agent")},
-            timeout=config.get("timeout"),
+            headers={"User-Agent": config.user_agent},
+            timeout=config.timeout,
         )
     except requests.exceptions.RequestException:
         tqdm.write("Error occurred while fetching item prices.")
         return {}
-    return response.json()
+    return loads_json(response.content)
 
 
 def fetch_item_prices(
@@ -45,8 +51,17 @@ def fetch_item_prices(
     config: Config,
     wait: float = 1.0,
     chunk_size: int = 100,
+    workers: int = 8,
+    checkpoint_interval: int = 10,
 ) -> dict:
-    """Gets the current prices for all tradeable items."""
+    """Gets the current prices for all tradeable items.
+
+    Wait is the amount of time to wait between starting requests.
+    Chunk size is the number of items to request prices for at once.
+    Workers is the maximum number of requests that can be in flight at once.
+    Checkpoint interval is the number of chunks to fetch before saving
+    intermittently; the prices are always saved once fetching stops.
+    """
 
     # Initialize the progress bar
     tqdm_bar = tqdm(
@@ -59,31 +74,44 @@ def fetch_item_prices(
 
     # Get current prices for all items in chunks
     all_prices = {}
-    for chunk in tqdm(as_chunks(item_ids, size=chunk_size)):
-        chunk_prices = get_current_prices_for_ids(chunk, config=config)
-        all_prices.update(chunk_prices)
-        tqdm_bar.update(len(chunk))
-        # Save the price data itermittently
+    fetch = partial(get_current_prices_for_ids, config=config)
+    try:
+        for count, (chunk, future) in enumerate(
+            as_completed_paced(
+                fetch,
+                as_chunks(item_ids, size=chunk_size),
+                wait=wait,
+                workers=workers,
+            ),
+            start=1,
+        ):
+            all_prices.update(future.result())
+            tqdm_bar.update(len(chunk))
+            # Save the price data intermittently
+            if count % checkpoint_interval == 0:
+                save_item_prices(all_prices, config=config)
+    finally:
+        # Save whatever price data was fetched, even if interrupted
+        tqdm_bar.close()
         save_item_prices(all_prices, config=config)
-        # Wait to avoid any potential rate limiting
-        time.sleep(wait)
     tqdm.write("Finished fetching prices.")
     return all_prices
 
 
 def save_item_prices(data: dict, config: Config) -> dict:
     """Saves the item prices to a JSON file and returns the dictionary."""
-    with StorageHandler.from_config(config) as handler:
+    with config.storage_handler as handler:
         handler.save(StorageItem.PRICES, data)
     return data
 
 
 def upload_item_prices(data: dict, config: Config) -> None:
     """Uploads the item prices to BigQuery."""
-    records = list(data.values())
-    df = pd.DataFrame.from_records(records)
-    df.columns = ["item_id", "timestamp", "price", "volume"]
-    df["uuid"] = df.apply(lambda _: str(uuid.uuid4()), axis=1)
+    df = pd.DataFrame.from_records(
+        list(data.values()),
+        columns=["id", "timestamp", "price", "volume"],
+    ).rename(columns={"id": "item_id"})
+    df["uuid"] = [str(uuid.uuid4()) for _ in range(len(df))]
     df["timestamp"] = pd.to_datetime(
         df["timestamp"],
         format="ISO8601",
@@ -94,13 +122,12 @@ def upload_item_prices(data: dict, config: Config) -> None:
         errors = handler.upload(BigQueryItem.PRICES, df)
         if any(item for item in errors):
             tqdm.write("Errors occurred while handling prices.")
-            tqdm.write(errors)
+            tqdm.write(str(errors))
 
 
 def generate_item_prices(config: Config) -> dict:
     """Generates the item prices file from start to finish."""
-    details_data = get_item_details(config=config)
-    item_ids = list(details_data["items"].keys())
+    item_ids = get_existing_item_ids(config=config)
     result = fetch_item_prices(item_ids, config=config)
     if config.storage_mode == StorageMode.CLOUD:
         upload_item_prices(result, config=config)
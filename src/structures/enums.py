@@ -5,9 +5,12 @@ All enums used in the project.
 from __future__ import annotations
 
 from enum import Enum, auto
+from functools import lru_cache
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    import datetime as dt
+
     from ..config import Config
 
 
@@ -33,12 +36,7 @@ class StorageItem(Enum):
 
     def filename(self, config: Config) -> str:
         """Gets the filename for the result."""
-        match self:
-            case StorageItem.DETAILS:
-                return "details.json"
-            case StorageItem.PRICES:
-                created = config.CREATED.strftime(r"%Y-%m-%dT%H:%M:%S")
-                return f"prices_{created}.json"
+        return _get_filename(self, config.CREATED)
 
     def bucket(self, config: Config) -> str:
         """Gets the bucket name for the result."""
@@ -54,3 +52,19 @@ class BigQueryItem(Enum):
     def table(self, config: Config) -> str:
         """Gets the table name for the result."""
         return config.get("tables", self.name.lower())
+
+
+# Filename templates for each storage item, formatted with the creation time
+FILENAME_TEMPLATES: dict[StorageItem, str] = {
+    StorageItem.DETAILS: "details.json",
+    StorageItem.PRICES: "prices_{created:%Y-%m-%dT%H:%M:%S}.json",
+}
+
+
+@lru_cache(maxsize=None)
+def _get_filename(item: StorageItem, created: dt.datetime) -> str:
+    """Formats the filename template for a storage item.
+
+    The result only depends on the creation time, so it is only built once.
+    """
+    return FILENAME_TEMPLATES[item].format(created=created)
@@ -4,9 +4,43 @@ Utility functions for the project.
 
 import datetime as dt
 import json
+import os
+import signal
+import threading
 import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+)
+from concurrent.futures import wait as wait_for_futures
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
-from typing import Any, Iterable, Iterator, NoReturn
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Iterable,
+    Iterator,
+    NoReturn,
+    TypeVar,
+)
+
+import ijson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+T = TypeVar("T")
+
+_STOP_EVENT = threading.Event()
+_POLL_INTERVAL = 0.1
 
 
 def validate_directory(path: str) -> Path | NoReturn:
@@ -28,16 +62,71 @@ def to_path(path: str | Path | None, default: str) -> Path:
     return path
 
 
+def loads_json(data: bytes | str) -> Any:
+    """Deserializes JSON bytes (or a string) into Python objects.
+
+    Uses orjson when it is available and falls back to the standard library.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(data: Any, indent: bool = False) -> bytes:
+    """Serializes Python objects into UTF-8 encoded JSON bytes.
+
+    Uses orjson when it is available and falls back to the standard library.
+    Since orjson only supports two-space indentation, the fallback matches it.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(
+        data,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
 def read_json(filename: str) -> dict:
     """Reads a JSON file and returns the contents as a dictionary."""
-    with open(filename, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(filename, "rb") as f:
+        return loads_json(f.read())
 
 
-def write_json(filename: str, data: Any, indent: int = 4) -> None:
-    """Writes data to a JSON file."""
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=indent)
+def iter_json_keys(file: BinaryIO, prefix: str) -> Iterator[str]:
+    """Yields the keys of the JSON object found at the prefix of a JSON file.
+
+    The file is parsed incrementally, so the values are never materialized.
+    """
+    for current_prefix, event, value in ijson.parse(file):
+        if current_prefix == prefix and event == "map_key":
+            yield value
+
+
+def write_json(filename: str, data: Any, indent: bool = True) -> None:
+    """Writes data to a JSON file.
+
+    The data is written to a temporary file that then replaces the original,
+    so an interrupted write never leaves a partially written file behind.
+    """
+    temporary = f"{filename}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(dumps_json(data, indent=indent))
+    os.replace(temporary, filename)
+
+
+def read_jsonl(filename: str) -> Iterator[Any]:
+    """Reads a JSON Lines file and yields each record in order.
+
+    A truncated trailing line (e.g. from an interrupted write) is ignored.
+    """
+    with open(filename, "rb") as f:
+        for line in f:
+            try:
+                yield loads_json(line)
+            except json.JSONDecodeError:
+                return
 
 
 def write_image(filename: str, data: bytes) -> None:
@@ -46,16 +135,41 @@ def write_image(filename: str, data: bytes) -> None:
         f.write(data)
 
 
+def create_session(pool_size: int = 32, retries: int = 3) -> requests.Session:
+    """Creates a requests session that keeps connections alive between calls.
+
+    Rate limiting and server errors are retried with an exponential backoff
+    (honoring any Retry-After header) before an exception is raised.
+    """
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+        ),
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
 def get_iso_datetime() -> dt.datetime:
     """Gets the current date and time in ISO format."""
     return dt.datetime.now(dt.timezone.utc).isoformat()
 
 
-def as_chunks(sequence: Iterable[int], size: int) -> Iterator[list[str]]:
-    """Splits a sequence into chunks of a specified size."""
-    return (
-        sequence[pos : pos + size] for pos in range(0, len(sequence), size)
-    )
+def as_chunks(iterable: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Splits an iterable into chunks of a specified size.
+
+    Any iterable is accepted, including generators and sets, and each chunk
+    is only built as it is requested.
+    """
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
 
 
 def wait_for_okay(wait: float) -> bool:
@@ -64,7 +178,115 @@ def wait_for_okay(wait: float) -> bool:
     Return True if the user has not interrupted the program, False otherwise.
     """
     try:
-        time.sleep(wait)
+        return not _STOP_EVENT.wait(timeout=wait)
     except KeyboardInterrupt:
         return False
-    return True
+
+
+@contextmanager
+def handle_interrupts() -> Iterator[threading.Event]:
+    """Sets a shared stop event when interrupted instead of raising an error.
+
+    While active, waits in wait_for_okay end as soon as the user interrupts,
+    and worker threads (which never receive KeyboardInterrupt) can check the
+    event. Signal handlers can only be installed from the main thread, so
+    elsewhere only the event is provided.
+    """
+    _STOP_EVENT.clear()
+    previous = None
+    if threading.current_thread() is threading.main_thread():
+        previous = signal.signal(signal.SIGINT, lambda *_: _STOP_EVENT.set())
+    try:
+        yield _STOP_EVENT
+    finally:
+        if previous is not None:
+            signal.signal(signal.SIGINT, previous)
+        _STOP_EVENT.clear()
+
+
+class RateLimiter:
+    """Limits how often calls can be made using a token bucket.
+
+    Tokens are added continuously at the provided rate (per second), and the
+    capacity is the number of calls that can be made in a single burst.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1) -> None:
+        """Initializes the RateLimiter object."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes a token and returns the number of seconds until it is valid.
+
+        Only the deficit is waited for, so time spent elsewhere since the
+        previous call counts towards the rate limit.
+        """
+        with self._lock:
+            now = time.monotonic()
+            refill = (now - self._updated_at) * self.rate
+            self._tokens = min(self.capacity, self._tokens + refill)
+            self._updated_at = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+
+def as_completed_paced(
+    func: Callable[[T], Any],
+    items: Iterable[T],
+    wait: float = 0.0,
+    workers: int = 4,
+) -> Iterator[tuple[T, Future]]:
+    """Calls a function on each item using a pool of worker threads.
+
+    A new call is started at most once every `wait` seconds, and no more than
+    `workers` calls are in progress at any time. Each item is yielded alongside
+    its finished future as soon as it completes, so the order is not preserved.
+
+    Raises KeyboardInterrupt as soon as the user interrupts, in which case any
+    calls that have not started yet are cancelled and any calls in progress
+    are left to finish in the background without being waited for.
+    """
+    limiter = RateLimiter(rate=1 / wait) if wait > 0 else None
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending: dict[Future, T] = {}
+
+    def wait_for_pending(timeout: float) -> Iterator[tuple[T, Future]]:
+        """Hands back any calls that finish within the timeout."""
+        done, _ = wait_for_futures(
+            pending,
+            timeout=timeout,
+            return_when=FIRST_COMPLETED,
+        )
+        for future in done:
+            yield pending.pop(future), future
+        if stop_event.is_set():
+            raise KeyboardInterrupt
+
+    try:
+        with handle_interrupts() as stop_event:
+            for item in items:
+                # Wait for a free worker before taking a token, so that time
+                # spent waiting for workers never builds up a burst of calls
+                while len(pending) >= workers:
+                    yield from wait_for_pending(_POLL_INTERVAL)
+                # Wait for the rate limit to allow another call
+                delay = limiter.reserve() if limiter is not None else 0.0
+                deadline = time.monotonic() + delay
+                while pending and time.monotonic() < deadline:
+                    remaining = max(0.0, deadline - time.monotonic())
+                    yield from wait_for_pending(min(_POLL_INTERVAL, remaining))
+                # Wait out the remaining delay while monitoring for interrupts
+                if not wait_for_okay(max(0.0, deadline - time.monotonic())):
+                    raise KeyboardInterrupt
+                pending[executor.submit(func, item)] = item
+            # Hand back the remaining calls as they finish
+            while pending:
+                yield from wait_for_pending(_POLL_INTERVAL)
+    finally:
+        # Cancel any calls that have not started, but do not wait for those
+        # in progress, so that stopping early takes effect immediately
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,99 @@
+"""
+Tests for the item details functions.
+"""
+
+import os
+import tempfile
+import unittest
+
+from src.details import replay_item_details_journal, save_item_details
+from src.structures.enums import StorageItem
+from src.utilities import dumps_json
+
+
+class FakeStorageHandler:
+    """Records the data saved through it instead of storing it."""
+
+    def __init__(self) -> None:
+        """Initializes the FakeStorageHandler object."""
+        self.saved = {}
+
+    def save(self, which: StorageItem, data: dict) -> None:
+        """Records the saved data."""
+        self.saved[which] = data
+
+
+def get_item(item_id: int) -> dict:
+    """Gets cleaned item details for the provided ID."""
+    return {
+        "id": item_id,
+        "name": f"Item {item_id}",
+        "description": "An item.",
+        "members": False,
+        "updated_at": "2025-01-01T00:00:00+00:00",
+    }
+
+
+class TestReplayItemDetailsJournal(unittest.TestCase):
+    """Tests the replay_item_details_journal function."""
+
+    def setUp(self) -> None:
+        """Creates a temporary journal file."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.journal_path = os.path.join(directory.name, "details.jsonl")
+
+    def write_journal(self, records: list[dict], partial: bytes = b"") -> None:
+        """Writes the records to the journal, followed by a partial line."""
+        with open(self.journal_path, "wb") as f:
+            for record in records:
+                f.write(dumps_json(record) + b"\n")
+            f.write(partial)
+
+    def test_truncated_last_line_is_ignored(self) -> None:
+        """Checks that complete records are replayed despite a partial one."""
+        self.write_journal(
+            [
+                {"id": "4", "details": get_item(4)},
+                {"id": "7", "details": None},
+            ],
+            partial=b'{"id": "9", "details": {"id": 9, "na',
+        )
+        data = {"items": {}, "invalid": []}
+        replay_item_details_journal(data, self.journal_path)
+        self.assertEqual(data["items"], {"4": get_item(4)})
+        self.assertEqual(data["invalid"], [7])
+
+    def test_known_invalid_ids_are_not_duplicated(self) -> None:
+        """Checks that invalid IDs already in the data are not added again."""
+        self.write_journal(
+            [
+                {"id": "7", "details": None},
+                {"id": "8", "details": None},
+                {"id": "8", "details": None},
+            ]
+        )
+        data = {"items": {}, "invalid": [7]}
+        replay_item_details_journal(data, self.journal_path)
+        self.assertEqual(data["invalid"], [7, 8])
+
+    def test_replayed_keys_are_saved_in_numeric_order(self) -> None:
+        """Checks that replayed keys are normalized and sorted numerically."""
+        self.write_journal(
+            [
+                {"id": "10", "details": get_item(10)},
+                {"id": 2, "details": get_item(2)},
+                {"id": "1", "details": get_item(1)},
+            ]
+        )
+        data = {"items": {"5": get_item(5)}, "invalid": [30, 3]}
+        replay_item_details_journal(data, self.journal_path)
+        handler = FakeStorageHandler()
+        save_item_details(data, handler=handler)
+        saved = handler.saved[StorageItem.DETAILS]
+        self.assertEqual(list(saved["items"]), ["1", "2", "5", "10"])
+        self.assertEqual(saved["invalid"], [3, 30])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Tests for the utility functions.
+"""
+
+import os
+import signal
+import threading
+import time
+import unittest
+
+from src.utilities import as_completed_paced
+
+
+class TestAsCompletedPaced(unittest.TestCase):
+    """Tests the as_completed_paced function."""
+
+    def test_calls_are_paced_when_workers_are_busy(self) -> None:
+        """Checks that waiting for a worker never causes a burst of calls."""
+        wait = 0.2
+        starts = []
+        lock = threading.Lock()
+
+        def call(item: int) -> int:
+            with lock:
+                starts.append(time.monotonic())
+            time.sleep(4 * wait if item % 2 == 0 else wait / 2)
+            return item
+
+        results = as_completed_paced(call, range(8), wait=wait, workers=2)
+        self.assertCountEqual([item for item, _ in results], range(8))
+        starts.sort()
+        gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+        self.assertGreaterEqual(min(gaps), wait * 0.9)
+
+    def test_interrupt_does_not_wait_for_calls_in_progress(self) -> None:
+        """Checks that an interrupt stops without joining running calls."""
+        timer = threading.Timer(0.2, os.kill, (os.getpid(), signal.SIGINT))
+        started_at = time.monotonic()
+        timer.start()
+        with self.assertRaises(KeyboardInterrupt):
+            list(as_completed_paced(time.sleep, [2.0] * 4, workers=4))
+        self.assertLess(time.monotonic() - started_at, 1.0)
+        self.assertIs(
+            signal.getsignal(signal.SIGINT),
+            signal.default_int_handler,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()